@@ -2,29 +2,41 @@ import time
 import asyncio
 
 class APIRateLimiter:
+    """Lock-free token bucket; refilled lazily on each call.
+
+    The event loop runs handlers one at a time between awaits, so the
+    refill/decrement below needs no lock - the fast path is pure
+    arithmetic with zero awaits.
+    """
+
     def __init__(self, calls_limit, time_period):
-        self.calls_limit = calls_limit
-        self.time_period = time_period
-        self.calls_made = []
-        self.lock = asyncio.Lock()
+        self.capacity = float(calls_limit)
+        self.rate = calls_limit / time_period
+        self.tokens = float(calls_limit)
+        self.last = time.monotonic()
 
     async def wait_if_needed(self):
-        async with self.lock:
-            current_time = time.time()
-            
-            # Remove old calls
-            self.calls_made = [call_time for call_time in self.calls_made if current_time - call_time <= self.time_period]
-            
-            if len(self.calls_made) >= self.calls_limit:
-                sleep_time = self.calls_made[0] + self.time_period - current_time
-                if sleep_time > 0:
-                    await asyncio.sleep(sleep_time)
-            
-            self.calls_made.append(time.time())
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        # Reserve the token before any sleep so concurrent waiters each
+        # take on a deeper deficit and get spaced one token apart, rather
+        # than all sleeping the same interval and passing together
+        self.tokens -= 1
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
 
 # Create a single instance of the rate limiter
 rate_limiter = APIRateLimiter(calls_limit=30, time_period=1)  # 30 calls per second
 
+# Bound methods cached per (bot, method) so repeated calls skip the
+# getattr/descriptor lookup
+_method_cache = {}
+
 async def api_call(bot, method, *args, **kwargs):
     await rate_limiter.wait_if_needed()
-    return await getattr(bot, method)(*args, **kwargs)
\ No newline at end of file
+    key = (id(bot), method)
+    fn = _method_cache.get(key)
+    if fn is None:
+        fn = _method_cache.setdefault(key, getattr(bot, method))
+    return await fn(*args, **kwargs)
\ No newline at end of file
@@ -1,6 +1,10 @@
 import asyncio
-import json
-import time
+# orjson is a drop-in for the call shapes used here and several times faster
+try:
+    import orjson as json
+except ImportError:
+    import json
+from aiolimiter import AsyncLimiter
 from datetime import datetime, timedelta
 from telegram import Bot, Chat, ChatPermissions, ChatMember, ChatMemberAdministrator, ChatMemberRestricted
 from telegram.error import TelegramError, RetryAfter
@@ -13,32 +17,13 @@ import logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-class BackgroundRateLimit:
-    def __init__(self, max_calls_per_second=12):
-        self.max_calls = max_calls_per_second
-        self.calls = 0
-        self.last_reset = time.time()
+# Leaky bucket for background API calls; the fixed-window counter it
+# replaces allowed 2x bursts across second boundaries
+background_limiter = AsyncLimiter(12, 1)
 
-    async def check_rate_limit(self):
-        current_time = time.time()
-        
-        # Reset counter if a second has passed
-        if current_time - self.last_reset >= 1:
-            self.calls = 0
-            self.last_reset = current_time
-            
-        # If we've hit our limit, wait until next second
-        if self.calls >= self.max_calls:
-            sleep_time = 1 - (current_time - self.last_reset)
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
-                self.calls = 0
-                self.last_reset = time.time()
-                
-        self.calls += 1
-
-# Create single instance for background tasks
-background_limiter = BackgroundRateLimit(12)
+# Bounds concurrent per-member checks; the limiter above paces the actual
+# API calls
+member_check_semaphore = asyncio.Semaphore(12)
 
 async def continuous_member_check(bot: Bot, clear_on_start=False):
     logger.info("Starting continuous member check")
@@ -48,19 +33,22 @@ async def continuous_member_check(bot: Bot, clear_on_start=False):
         await clear_member_data()
 
     while True:
-        chat_keys = await redis_client.keys('new_members:*')
-        logger.info(f"Found {len(chat_keys)} chats with members in queue")
-        for chat_key in chat_keys:
-            chat_id = chat_key.decode('utf-8').split(':')[1]
+        # Read the chat index set instead of KEYS, which scans (and blocks)
+        # the whole keyspace
+        chat_ids = await redis_client.smembers('active_chats')
+        logger.info(f"Found {len(chat_ids)} chats with members in queue")
+        for chat_id in chat_ids:
+            chat_id = chat_id.decode('utf-8')
             logger.info(f"Processing members for chat: {chat_id}")
             try:
-                await background_limiter.check_rate_limit()
+                await background_limiter.acquire()
                 chat = await bot.get_chat(chat_id)
                 await process_chat_members(bot, chat)
             except TelegramError as e:
                 logger.error(f"Unable to fetch chat {chat_id}: {e}")
-                await redis_client.delete(chat_key)
-                unique_keys = await redis_client.keys(f'{chat_id}:*')
+                await redis_client.delete(f'new_members:{chat_id}')
+                await redis_client.srem('active_chats', chat_id)
+                unique_keys = [k async for k in redis_client.scan_iter(match=f'{chat_id}:*', count=500)]
                 if unique_keys:
                     await redis_client.delete(*unique_keys)
                 logger.info(f"Cleared all data for chat {chat_id}")
@@ -75,33 +63,49 @@ async def process_chat_members(bot: Bot, chat: Chat):
     
     key = f'new_members:{chat_id}'
 
-    # Remove members older than 1 day based on added_at
+    # The sorted set holds user ids scored by last_checked; the record
+    # itself lives in a per-member hash. Load the hashes in one pipeline,
+    # dropping entries that expired or whose hash is gone.
     try:
-        members = await redis_client.zrange(key, 0, -1)
-        to_remove = []
-        
-        for member_json in members:
-            try:
-                member_data = json.loads(member_json)
-                if current_time - member_data['added_at'] > (60 * 60 * 24 * 1):  # 1 day
-                    to_remove.append(member_json)
-                    unique_key = f"{chat_id}:{member_data['user_id']}"
-                    await redis_client.delete(unique_key)
-                    logger.info(f"Member {member_data['user_id']} removed after 1 day")
-            except json.JSONDecodeError:
-                to_remove.append(member_json)
-                logger.error(f"Invalid JSON: {member_json}")
-
-        if to_remove:
-            for item in to_remove:
-                await redis_client.zrem(key, item)
-            logger.info(f"Removed {len(to_remove)} members from chat {chat_id}")
-    except Exception as e:
-        logger.error(f"Error removing members from {chat_id}: {e}")
+        user_ids = [uid.decode() for uid in await redis_client.zrange(key, 0, -1)]
+
+        hashes = []
+        if user_ids:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.hgetall(f'{chat_id}:{user_id}')
+                hashes = await pipe.execute()
+
+        members = []
+        stale_ids = []
+        for user_id, member_hash in zip(user_ids, hashes):
+            if not member_hash:
+                # Tracking hash expired (7 days) or was removed
+                stale_ids.append(user_id)
+                continue
+            fields = {k.decode(): v.decode() for k, v in member_hash.items()}
+            member_data = {
+                'user_id': fields.get('user_id', user_id),
+                'full_name': fields.get('full_name', ''),
+                'username': fields.get('username', ''),
+                'added_at': float(fields.get('added_at', 0)),
+                'last_checked': float(fields.get('last_checked', 0)),
+                'permissions': fields.get('permissions', ''),
+            }
+            if current_time - member_data['added_at'] > (60 * 60 * 24 * 1):  # 1 day
+                stale_ids.append(user_id)
+                logger.info(f"Member {user_id} removed after 1 day")
+                continue
+            members.append(member_data)
+
+        if stale_ids:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zrem(key, *stale_ids)
+                for user_id in stale_ids:
+                    pipe.delete(f'{chat_id}:{user_id}')
+                await pipe.execute()
+            logger.info(f"Removed {len(stale_ids)} members from chat {chat_id}")
 
-    # Get remaining members
-    try:
-        members = await redis_client.zrange(key, 0, -1, withscores=True)
         logger.info(f"Found {len(members)} members in queue for chat {chat_id}")
     except Exception as e:
         logger.error(f"Error fetching members from {chat_id}: {e}")
@@ -111,52 +115,63 @@ async def process_chat_members(bot: Bot, chat: Chat):
     skipped_count = 0
     failed_count = 0
 
-    for member_json, score in members:
-        member_data = json.loads(member_json)
-        user_id = member_data.get('user_id')
-        last_checked = member_data.get('last_checked', 0)
-        
-        #logger.info(f"Checking member {member_data['user_id']}. Last checked: {datetime.fromtimestamp(last_checked)}, Current time: {datetime.fromtimestamp(current_time)}")
-        
-        if last_checked >= check_threshold:
+    to_check = []
+    for member_data in members:
+        if member_data['last_checked'] >= check_threshold:
             skipped_count += 1
-            # logger.debug(f"Skipping recently checked member {user_id} in {chat_id}")
+            # logger.debug(f"Skipping recently checked member in {chat_id}")
             continue
-
-        try:
-            await process_single_member(bot, chat, member_data)
-            processed_count += 1
-        except RetryAfter as e:
-            logger.warning(f"Rate limited. Waiting for {e.retry_after} seconds.")
-            await asyncio.sleep(e.retry_after)
-        except TelegramError as e:
+        to_check.append(member_data)
+
+    # One verified-member fetch per chat cycle, shared by every check below
+    verified_members = await get_verified_members(chat_id)
+
+    async def check_one(member_data):
+        async with member_check_semaphore:
+            await process_single_member(bot, chat, member_data, verified_members)
+
+    # Process members concurrently; the semaphore bounds in-flight checks
+    # and background_limiter paces the underlying API calls
+    results = await asyncio.gather(
+        *(check_one(member_data) for member_data in to_check),
+        return_exceptions=True
+    )
+
+    retry_after = 0
+    for member_data, result in zip(to_check, results):
+        if isinstance(result, RetryAfter):
+            retry_after = max(retry_after, result.retry_after)
+        elif isinstance(result, TelegramError):
             failed_count += 1
-            logger.error(f"Failed to process member {user_id} in {chat_id}: {e}")
-            
-        await asyncio.sleep(0.05)  # Rate limiting
+            logger.error(f"Failed to process member {member_data.get('user_id')} in {chat_id}: {result}")
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            processed_count += 1
 
-    logger.info(f"Processed {processed_count} members and skipped {skipped_count} members in chat {chat_id}")
+    if retry_after:
+        logger.warning(f"Rate limited. Waiting for {retry_after} seconds.")
+        await asyncio.sleep(retry_after)
 
-    # Clean up duplicates
-    try:
-        await cleanup_duplicates(chat_id)
-    except Exception as e:
-        logger.error(f"Error cleaning up duplicates for {chat_id}: {e}")
+    logger.info(f"Processed {processed_count} members and skipped {skipped_count} members in chat {chat_id}")
 
     # Final count verification
     try:
-        final_members = await redis_client.zrange(key, 0, -1)
+        final_count = await redis_client.zcard(key)
+        if final_count == 0:
+            # Nothing left queued for this chat; drop it from the index
+            await redis_client.srem('active_chats', chat_id)
         logger.info(
             f"Chat {chat_id} summary: "
             f"Processed {processed_count}, "
             f"Skipped {skipped_count}, "
             f"Failed {failed_count}, "
-            f"Final queue size {len(final_members)}"
+            f"Final queue size {final_count}"
         )
     except Exception as e:
         logger.error(f"Error getting final count for {chat_id}: {e}")
 
-async def process_single_member(bot: Bot, chat: Chat, member_data: dict):
+async def process_single_member(bot: Bot, chat: Chat, member_data: dict, verified_members: dict):
     chat_id = str(chat.id)
     user_id = member_data['user_id']
     logger.info(f"Starting to process member {user_id} in chat {chat_id}")
@@ -164,22 +179,13 @@ async def process_single_member(bot: Bot, chat: Chat, member_data: dict):
     unique_key = f'{chat_id}:{member_data["user_id"]}'
 
     async def remove_member():
-        # Remove both the sorted set entry and unique key
-        member_json = json.dumps(member_data)
-        removed = await redis_client.zrem(key, member_json)
-        await redis_client.delete(unique_key)
+        # Remove both the sorted set entry and the member hash in one round-trip
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zrem(key, str(user_id))
+            pipe.delete(unique_key)
+            removed, _ = await pipe.execute()
         logger.info(f"Removed member {user_id} from queue: {removed}")
-        
-        # Verify removal
-        if await redis_client.zscore(key, member_json) is not None:
-            logger.error(f"Failed to remove member {user_id} from queue!")
 
-    # Check if tracking key exists (7-day expiry key)
-    if not await redis_client.exists(unique_key):
-        logger.info(f"Member {user_id} tracking key not found, removing from queue")
-        await remove_member()
-        return
-        
     # Check 2-minute expiry based on added_at
     current_time = datetime.now().timestamp()
     if current_time - member_data['added_at'] > (60 * 60 * 24 * 1):
@@ -203,53 +209,51 @@ async def process_single_member(bot: Bot, chat: Chat, member_data: dict):
         # Calculate restriction end time (35 seconds from now)
         until_date = datetime.now() + timedelta(seconds=35)
 
-        await background_limiter.check_rate_limit()
-        await bot.restrict_chat_member(
-            chat_id, 
-            member_data['user_id'], 
-            permissions=new_permissions,
-            until_date=until_date
+        # The restriction and the member fetch have no data dependency, so
+        # run them concurrently; account for both calls in the limiter first
+        await background_limiter.acquire()
+        await background_limiter.acquire()
+        restrict_result, member = await asyncio.gather(
+            bot.restrict_chat_member(
+                chat_id,
+                member_data['user_id'],
+                permissions=new_permissions,
+                until_date=until_date
+            ),
+            chat.get_member(member_data['user_id']),
+            return_exceptions=True
         )
-        #logger.info(f"Toggled off all permissions for member {member_data['user_id']} until {until_date}")
-
-        # Step 2: Fetch updated member info
-        try:
-            await background_limiter.check_rate_limit()
-            member = await chat.get_member(member_data['user_id'])
-            
-            # Add validation check for member object
-            if not isinstance(member, (ChatMember, ChatMemberRestricted, ChatMemberAdministrator)):
-                logger.error(f"Unexpected member type received: {type(member)} for user {user_id}")
-                await remove_member()
-                return
 
-            if member.status in ['left', 'kicked']:
-                logger.info(f"Member {user_id} no longer in chat")
-                await remove_member()
-                return
-                
-            # logger.info(f"stored name: {member_data['full_name']}")
-            # logger.info(f"current name: {member.user.full_name}")
+        if isinstance(member, TelegramError):
+            logger.error(f"Failed to fetch member info for {user_id}: {member}")
+            await remove_member()
+            return
+        if isinstance(member, BaseException):
+            raise member
+        if isinstance(restrict_result, BaseException):
+            raise restrict_result
+
+        # Add validation check for member object
+        if not isinstance(member, (ChatMember, ChatMemberRestricted, ChatMemberAdministrator)):
+            logger.error(f"Unexpected member type received: {type(member)} for user {user_id}")
+            await remove_member()
+            return
 
-        except TelegramError as e:
-            logger.error(f"Failed to fetch member info for {user_id}: {e}")
+        if member.status in ['left', 'kicked']:
+            logger.info(f"Member {user_id} no longer in chat")
             await remove_member()
             return
         
-        if member.user.full_name != member_data['full_name'] or member.user.username != member_data['username']:
+        if member.user.full_name != member_data['full_name'] or (member.user.username or '') != member_data['username']:
             logger.info(f"Member {member_data['user_id']} info changed, checking for impersonation")
-            verified_members = await get_verified_members(chat_id)
-
             if await is_user_verified(member_data['user_id'], verified_members):
-                # TODO: isolate this into its own function since its repeated
-                await redis_client.zrem(key, json.dumps(member_data))
-                await redis_client.delete(unique_key)
+                await remove_member()
                 return
 
             is_impersonator, is_blacklist = await check_impersonation(member.user.full_name, member.user.username, verified_members, chat.title)
             if is_impersonator:
                 logger.warning(f"Member {member_data['user_id']} identified as impersonator, banning")
-                await background_limiter.check_rate_limit()
+                await background_limiter.acquire()
                 await ban_user(chat, member.user.id, member.user.full_name, "impersonation of a team member", is_blacklist)
                 await log_to_database('moderation', user_id, chat.id, 
                               f"Banned new member {member.user.full_name} for impersonation - Member Monitor", 
@@ -259,18 +263,33 @@ async def process_single_member(bot: Bot, chat: Chat, member_data: dict):
             else:
                 logger.info(f"Updating info for member {member_data['user_id']}")
                 member_data['full_name'] = member.user.full_name
-                member_data['username'] = member.user.username
+                member_data['username'] = member.user.username or ''
+                name_changed = True
         else:
             logger.info(f"No changes detected for member {member_data['user_id']}")
+            name_changed = False
 
-        # Step 3: Always update last_checked
+        # Step 3: Always update last_checked, but only persist the fields
+        # that actually changed
         member_data['last_checked'] = datetime.now().timestamp()
-        member_data['permissions'] = get_member_permissions(member).to_dict()
-        
-        # Update the entry in Redis
-        new_json = json.dumps(member_data)
-        await redis_client.zadd(key, {new_json: member_data['last_checked']})
-        
+        # to_dict() builds its keys in a fixed order, so the serialized form
+        # is stable across cycles and safe to compare for change detection
+        permissions_json = json.dumps(get_member_permissions(member).to_dict())
+        if isinstance(permissions_json, bytes):  # orjson emits bytes
+            permissions_json = permissions_json.decode()
+
+        mapping = {'last_checked': member_data['last_checked']}
+        if name_changed:
+            mapping['full_name'] = member_data['full_name']
+            mapping['username'] = member_data['username']
+        if permissions_json != member_data['permissions']:
+            mapping['permissions'] = permissions_json
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hset(unique_key, mapping=mapping)
+            pipe.zadd(key, {str(user_id): member_data['last_checked']})
+            await pipe.execute()
+
         logger.info(f"Updated Redis entry for member {member_data['user_id']}")
         
     except TelegramError as e:
@@ -291,55 +310,30 @@ async def add_member_to_queue(chat_id, user_id, full_name, username):
     key = f'new_members:{chat_id}'
     current_time = datetime.now().timestamp()
     
-    member_data = {
-        'user_id': user_id,
-        'full_name': full_name,
-        'username': username,
-        'added_at': current_time,
-        'last_checked': current_time,
-        'permissions': None
-    }
-    
-    # Use user_id as a unique identifier
+    # The member hash doubles as the uniqueness key
     unique_key = f'{chat_id}:{user_id}'
-    
+
     # Check if member already exists
     if await redis_client.exists(unique_key):
         logger.info(f"Member {user_id} already in queue for chat {chat_id}")
         return
 
-    # Add to sorted set
-    await redis_client.zadd(key, {json.dumps(member_data): current_time})
-    # Set a separate key to ensure uniqueness
-    await redis_client.set(unique_key, '', ex=7*24*60*60)  # Expires in 7 days
-    
-    logger.info(f"Added new member to queue: {member_data}")
-
-async def cleanup_duplicates(chat_id: str):
-    key = f'new_members:{chat_id}'
-    members = await redis_client.zrange(key, 0, -1, withscores=True)
-    seen = {}
-    duplicates = []
-    
-    for member_json, score in members:
-        member_data = json.loads(member_json)
-        user_id = member_data['user_id']
-        if user_id in seen:
-            # Compare last_checked timestamps, keep the most recent
-            if member_data['last_checked'] > seen[user_id]['last_checked']:
-                duplicates.append(json.dumps(seen[user_id]))
-                seen[user_id] = member_data
-            else:
-                duplicates.append(member_json)
-        else:
-            seen[user_id] = member_data
-    
-    if duplicates:
-        logger.warning(f"Found {len(duplicates)} duplicate entries in chat {chat_id}. Removing...")
-        for duplicate in duplicates:
-            await redis_client.zrem(key, duplicate)
-    else:
-        logger.info(f"No duplicates found in chat {chat_id}")
+    # Write the member hash, score the user id in the sorted set and index
+    # the chat in one round-trip
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.hset(unique_key, mapping={
+            'user_id': str(user_id),
+            'full_name': full_name or '',
+            'username': username or '',
+            'added_at': current_time,
+            'last_checked': current_time
+        })
+        pipe.expire(unique_key, 7*24*60*60)  # Expires in 7 days
+        pipe.zadd(key, {str(user_id): current_time})
+        pipe.sadd('active_chats', str(chat_id))
+        await pipe.execute()
+
+    logger.info(f"Added new member {user_id} to queue for chat {chat_id}")
 
 def get_member_permissions(member):
     if isinstance(member, ChatMemberRestricted):
@@ -370,27 +364,32 @@ def get_member_permissions(member):
         return ChatPermissions()
 
 async def clear_member_data(chat_id=None):
+    # SCAN is cursor-based and does not block Redis the way KEYS does
     if chat_id:
         # Clear specific chat
         sorted_set = f'new_members:{chat_id}'
-        unique_keys = await redis_client.keys(f'{chat_id}:*')
-        
+        unique_keys = [k async for k in redis_client.scan_iter(match=f'{chat_id}:*', count=500)]
+
         if await redis_client.exists(sorted_set):
             await redis_client.delete(sorted_set)
             logger.info(f"Cleared sorted set for chat {chat_id}")
-            
+
         if unique_keys:
             await redis_client.delete(*unique_keys)
             logger.info(f"Cleared {len(unique_keys)} unique keys for chat {chat_id}")
+
+        await redis_client.srem('active_chats', str(chat_id))
     else:
         # Clear all member-related data
-        member_keys = await redis_client.keys('new_members:*')
-        unique_keys = await redis_client.keys('*:*')
-        
+        member_keys = [k async for k in redis_client.scan_iter(match='new_members:*', count=500)]
+        unique_keys = [k async for k in redis_client.scan_iter(match='*:*', count=500)]
+
         if member_keys:
             await redis_client.delete(*member_keys)
             logger.info(f"Cleared {len(member_keys)} member queues")
-            
+
         if unique_keys:
             await redis_client.delete(*unique_keys)
-            logger.info(f"Cleared {len(unique_keys)} unique keys")
\ No newline at end of file
+            logger.info(f"Cleared {len(unique_keys)} unique keys")
+
+        await redis_client.delete('active_chats')
\ No newline at end of file
@@ -1,6 +1,7 @@
-from sklearn.feature_extraction.text import CountVectorizer
+import asyncio
 import logging
-from fuzzywuzzy import fuzz
+from functools import lru_cache
+from rapidfuzz import fuzz, process
 from app.services.database import add_blacklisted_user
 from app.telegram.llm_interface import llm_check_impersonation, llm_check_spam
 from jellyfish import soundex, metaphone
@@ -14,8 +15,6 @@ logger = logging.getLogger(__name__)
 
 # Regular expressions for detecting URLs, wallet addresses, and contract addresses
 URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
-ETH_ADDRESS_PATTERN = re.compile(r'0x[a-fA-F0-9]{40}')
-BTC_ADDRESS_PATTERN = re.compile(r'[13][a-km-zA-HJ-NP-Z1-9]{25,34}')
 
 # Add more suspicious top-level domains
 SUSPICIOUS_TLDS = {'scam', 'xyz', 'tk', 'ml', 'ga', 'cf', 'gq'}
@@ -36,6 +35,17 @@ SUSPICIOUS_KEYWORDS = {
     'invest', 'emergency', 'gains', 'giving away', 'free', 'send funds', 'fork'
 }
 
+# Single-pass scanners compiled once at import: one alternation covers the
+# whole keyword set (longest-first so multi-word phrases win over their
+# prefixes), and one pattern covers both address formats
+_KEYWORD_ALTERNATION = '|'.join(
+    re.escape(keyword) for keyword in sorted(SUSPICIOUS_KEYWORDS, key=len, reverse=True)
+)
+SUSPICIOUS_KEYWORD_PATTERN = re.compile(r'\b(?:' + _KEYWORD_ALTERNATION + r')\b')
+SUSPICIOUS_KEYWORD_SUBSTRING_PATTERN = re.compile(_KEYWORD_ALTERNATION)
+SUSPICIOUS_TLD_PATTERN = re.compile(r'\.(?:' + '|'.join(map(re.escape, sorted(SUSPICIOUS_TLDS))) + r')$')
+CRYPTO_ADDRESS_PATTERN = re.compile(r'0x[a-fA-F0-9]{40}|[13][a-km-zA-HJ-NP-Z1-9]{25,34}')
+
 
 async def extract_message_content(message: Message) -> Tuple[str, str]:
     """
@@ -98,26 +108,44 @@ async def check_impersonation(sender_name, sender_username, verified_members, ch
     sender_name_norm = normalize_name(sender_name)
     sender_username_norm = normalize_name(sender_username) if sender_username else None
     chat_title_norm = normalize_name(chat_title)
-    bot_name_norm = normalize_name("AthenaSecure")
-
-    max_similarity = 0
-    max_similarity_type = "no_match"
 
-    # Check for bot name impersonation
-    bot_name_ratio = max(fuzz.ratio(bot_name_norm, sender_name_norm) / 100,
-                         fuzz.partial_ratio(bot_name_norm, sender_name_norm) / 100)
+    # score_cutoff lets rapidfuzz reject pairs from the length-difference
+    # bound in O(1) before running the full scorer
+    bot_name_ratio = max(fuzz.ratio(BOT_NAME_NORM, sender_name_norm, score_cutoff=90) / 100,
+                         fuzz.partial_ratio(BOT_NAME_NORM, sender_name_norm, score_cutoff=90) / 100)
     if bot_name_ratio >= 0.9:
         return True, True
 
     # Check for chat title impersonation
-    chat_title_ratio = max(fuzz.ratio(chat_title_norm, sender_name_norm) / 100,
-                           fuzz.partial_ratio(chat_title_norm, sender_name_norm) / 100)
+    chat_title_ratio = max(fuzz.ratio(chat_title_norm, sender_name_norm, score_cutoff=90) / 100,
+                           fuzz.partial_ratio(chat_title_norm, sender_name_norm, score_cutoff=90) / 100)
     if chat_title_ratio >= 0.9:
         return True, True
 
-    for member in verified_members:
-        verified_name = normalize_name(member.get('telegram_full_name', ''))
-        verified_username = normalize_name(member.get('telegram_username', '').lstrip('@'))
+    members = list(verified_members.values())
+    if not members:
+        return False, False
+
+    verified_names = [normalize_name(member.get('telegram_full_name', '')) for member in members]
+    verified_usernames = [normalize_name(member.get('telegram_username', '').lstrip('@')) for member in members]
+
+    # Score the sender against every verified member in a handful of
+    # vectorized native calls instead of four scalar calls per member
+    # Scores below 65 never influence any gate, so the cutoff lets the
+    # length-difference bound prune most pairs before scoring
+    name_ratios = process.cdist([sender_name_norm], verified_names, scorer=fuzz.ratio, score_cutoff=65)[0]
+    name_partials = process.cdist([sender_name_norm], verified_names, scorer=fuzz.partial_ratio, score_cutoff=65)[0]
+    if sender_username_norm:
+        username_ratios = process.cdist([sender_username_norm], verified_usernames, scorer=fuzz.ratio, score_cutoff=65)[0]
+        username_partials = process.cdist([sender_username_norm], verified_usernames, scorer=fuzz.partial_ratio, score_cutoff=65)[0]
+
+    # Pass 1: deterministic checks, collecting the 0.65+ band for a single
+    # batched LLM pass afterwards instead of one blocking await per member
+    llm_candidates = []
+
+    for i, member in enumerate(members):
+        verified_name = verified_names[i]
+        verified_username = verified_usernames[i]
 
         # Skip verification against short names/usernames
         if len(verified_name) < 6 and (not verified_username or len(verified_username) < 6):
@@ -126,29 +154,32 @@ async def check_impersonation(sender_name, sender_username, verified_members, ch
         # High-confidence checks
         if len(verified_name) >= 6 and sender_name_norm == verified_name:
             return True, True
-        
-        name_ratio = fuzz.ratio(verified_name, sender_name_norm) / 100
+
+        name_ratio = name_ratios[i] / 100
         if name_ratio >= 0.95:
             return True, True
-        
-        if phonetic_similarity(verified_name, sender_name_norm):
-            return True, True
-        
-        if compare_name_components(verified_name, sender_name_norm):
-            return True, True
+
+        # phonetic_similarity demands ratio >= 95 and compare_name_components
+        # implies equality on normalized strings, so the vectorized score
+        # prefilters candidates before any per-member soundex/metaphone work
+        if name_ratios[i] >= 95:
+            if phonetic_similarity(verified_name, sender_name_norm):
+                return True, True
+
+            if compare_name_components(verified_name, sender_name_norm):
+                return True, True
 
         # Calculate various similarity metrics
-        name_partial = fuzz.partial_ratio(verified_name, sender_name_norm) / 100
+        name_partial = name_partials[i] / 100
         name_similarity = max(name_ratio, name_partial)
-        
-        if name_similarity > max_similarity:
-            max_similarity = name_similarity
-            max_similarity_type = "name_similarity"
+
+        if name_similarity >= 0.65:
+            llm_candidates.append((member.get('telegram_full_name', ''), sender_name, name_similarity))
 
         # Username checks
         if sender_username_norm and verified_username:
-            username_ratio = fuzz.ratio(verified_username, sender_username_norm) / 100
-            username_partial = fuzz.partial_ratio(verified_username, sender_username_norm) / 100
+            username_ratio = username_ratios[i] / 100
+            username_partial = username_partials[i] / 100
 
             # High-confidence checks
             if sender_username_norm == verified_username:
@@ -156,48 +187,54 @@ async def check_impersonation(sender_name, sender_username, verified_members, ch
             
             if username_ratio >= 0.95:
                 return True, True
-            
-            if phonetic_similarity(verified_username, sender_username_norm):
-                return True, True
-            
-            if compare_name_components(verified_username, sender_username_norm):
-                return True, True
+
+            if username_ratios[i] >= 95:
+                if phonetic_similarity(verified_username, sender_username_norm):
+                    return True, True
+
+                if compare_name_components(verified_username, sender_username_norm):
+                    return True, True
 
             username_similarity = max(username_ratio, username_partial)
-            
-            if username_similarity > max_similarity:
-                max_similarity = username_similarity
-                max_similarity_type = "username_similarity"
-
-        # If similarity is 65% or higher, pass to LLM for final check
-        if max_similarity >= 0.65:
-            if max_similarity_type == "name_similarity":
-                llm_reason, llm_result, llm_confidence, llm_score = await llm_check_impersonation(member.get('telegram_full_name', ''), sender_name)
-            
-            elif max_similarity_type == "username_similarity":
-                llm_reason, llm_result, llm_confidence, llm_score = await llm_check_impersonation(member.get('telegram_username', '').lstrip('@'), sender_username)
-            
-            if llm_result:
-                if int(llm_score) >= 90:
-                    logger.warning(f"User {sender_name} being added to blacklist due to impersonation of {member.get('telegram_full_name', '')} with score of {llm_score}")
-                    logger.warning(f"User {sender_username} being banned due to impersonation of {member.get('telegram_username', '')} with score of {llm_score}")
-                    logger.warning(f"max similarity: {max_similarity}")
-                    logger.warning(f"max similarity type: {max_similarity_type}")
-                    return True, True 
-                elif int(llm_score) >= 69:
-                    logger.warning(f"User {sender_name} being banned due to impersonation of {member.get('telegram_full_name', '')} with score of {llm_score}")
-                    logger.warning(f"User {sender_username} being banned due to impersonation of {member.get('telegram_username', '')} with score of {llm_score}")
-                    logger.warning(f"max similarity: {max_similarity}")
-                    logger.warning(f"max similarity type: {max_similarity_type}")
-                    return True, False
-                else:
-                    logger.warning(f"User {sender_name} not being added to blacklist due to impersonation of {member.get('telegram_full_name', '')} with score of {llm_score}")
-                    logger.warning(f"User {sender_username} not being banned due to impersonation of {member.get('telegram_username', '')} with score of {llm_score}")
-                    logger.warning(f"max similarity: {max_similarity}")
-                    logger.warning(f"max similarity type: {max_similarity_type}")
-                    return False, False
-
-    return False, False
+
+            if username_similarity >= 0.65:
+                llm_candidates.append((member.get('telegram_username', '').lstrip('@'), sender_username, username_similarity))
+
+    if not llm_candidates:
+        return False, False
+
+    # Pass 2: one batched round of LLM checks over the deduplicated
+    # shortlist, bounded so a long shortlist cannot flood the executor
+    unique_pairs = list(dict.fromkeys((verified, sender) for verified, sender, _ in llm_candidates))
+    llm_semaphore = asyncio.Semaphore(4)
+
+    async def check_pair(verified, sender):
+        async with llm_semaphore:
+            return await llm_check_impersonation(verified, sender)
+
+    results = await asyncio.gather(
+        *(check_pair(verified, sender) for verified, sender in unique_pairs),
+        return_exceptions=True
+    )
+
+    should_ban = False
+    for (verified, sender), result in zip(unique_pairs, results):
+        if isinstance(result, BaseException):
+            logger.error(f"LLM impersonation check failed for {sender} against {verified}: {result}")
+            continue
+        llm_reason, llm_result, llm_confidence, llm_score = result
+        if not llm_result:
+            continue
+        if int(llm_score) >= 90:
+            logger.warning(f"User {sender} being added to blacklist due to impersonation of {verified} with score of {llm_score}")
+            return True, True
+        elif int(llm_score) >= 69:
+            logger.warning(f"User {sender} being banned due to impersonation of {verified} with score of {llm_score}")
+            should_ban = True
+        else:
+            logger.warning(f"User {sender} not being banned for impersonation of {verified} with score of {llm_score}")
+
+    return (True, False) if should_ban else (False, False)
 
 async def check_spam(message, is_admin, project_info):
     if is_admin:
@@ -220,102 +257,92 @@ async def check_spam(message, is_admin, project_info):
     return False, 0
 
 def compare_name_components(name1, name2):
-    # Split names into components, preserving underscores and numbers
-    def split_components(name):
-        return re.findall(r'[a-z0-9]+|_', name.lower())
-    
-    components1 = split_components(name1)
-    components2 = split_components(name2)
-    
-    # Check if components are the same, ignoring order
-    return set(components1) == set(components2)
+    # Callers pass normalize_name output (lowercase letters plus any
+    # underscores), so components are just the '_'-separated pieces; no
+    # regex tokenization needed to compare them order-insensitively
+    return set(name1.split('_')) == set(name2.split('_'))
 
-def phonetic_similarity(name1, name2):
-    soundex_sim = soundex(name1) == soundex(name2)
-    metaphone_sim = metaphone(name1) == metaphone(name2)
-    ratio = fuzz.ratio(name1, name2)
-    return soundex_sim and metaphone_sim and ratio >= 95 and abs(len(name1) - len(name2)) <= 1
+@lru_cache(maxsize=4096)
+def phonetic_keys(name):
+    return soundex(name), metaphone(name)
 
+def phonetic_similarity(name1, name2):
+    soundex1, metaphone1 = phonetic_keys(name1)
+    soundex2, metaphone2 = phonetic_keys(name2)
+    ratio = fuzz.ratio(name1, name2, score_cutoff=95)
+    return soundex1 == soundex2 and metaphone1 == metaphone2 and ratio >= 95 and abs(len(name1) - len(name2)) <= 1
+
+# Multi-character substitutions; these must run before the single-character
+# table so 'vv' -> 'w' wins over 'v' -> 'u' and the accented Cyrillic pairs
+# are not split by their base-letter mappings
+_MULTI_SUBS = {
+    'vv': 'w',
+    'rn': 'm',
+    'nn': 'm',
+    'и́': 'i', 'ы́': 'y', 'э́': 'e', 'ю́': 'yu', 'я́': 'ya',
+}
+_MULTI_PATTERN = re.compile('|'.join(map(re.escape, _MULTI_SUBS)))
+
+# Single-character substitutions, applied in one C-level translate pass:
+# leetspeak, fancy Unicode letters and Cyrillic lookalikes
+_CHAR_TABLE = str.maketrans({
+    '@': 'a', '4': 'a',
+    '3': 'e',
+    '1': 'i', '!': 'i', '|': 'i', 'l': 'i',
+    '0': 'o',
+    '5': 's', '$': 's',
+    '7': 't',
+    'v': 'u',
+    # Cyrillic to Latin
+    'а': 'a', 'в': 'b', 'с': 'c', 'е': 'e', 'о': 'o', 'р': 'p', 'х': 'x', 'у': 'y',
+    'ё': 'e', 'ъ': None, 'ь': None,
+    # Fancy Unicode characters
+    '𝓔': 'e', '𝓬': 'c', '𝓱': 'h', '𝓸': 'o', '𝓞': 'o', '𝓣': 't', '𝓓': 'd',
+})
+
+_NON_ALPHA_PATTERN = re.compile(r'[^a-z]+')
+
+# Pure function of the input string, and verified-member names repeat on
+# every join/message check, so memoize the whole pipeline
+@lru_cache(maxsize=4096)
 def normalize_name(name):
     name = name.lower()
-    # Common substitutions
-    substitutions = {
-        '@': 'a', '4': 'a', 
-        '3': 'e',
-        '1': 'i', '!': 'i', '|': 'i', 'l': 'i',
-        '0': 'o',
-        '5': 's', '$': 's',
-        '7': 't',
-        'vv': 'w',
-        'v': 'u',
-        'rn': 'm',
-        'cl': 'd',
-        'nn': 'm',
-        # Cyrillic to Latin
-        'а': 'a', 'в': 'b', 'с': 'c', 'е': 'e', 'о': 'o', 'р': 'p', 'х': 'x', 'у': 'y',
-        'ё': 'e', 'ъ': '', 'ь': '', 'а́': 'a', 'е́': 'e', 'и́': 'i', 'о́': 'o', 'у́': 'u',
-        'ы́': 'y', 'э́': 'e', 'ю́': 'yu', 'я́': 'ya'
-    }
-    fancy_char_map = {
-        '𝓔': 'e', '𝓬': 'c', '𝓱': 'h', '𝓸': 'o', '𝓞': 'o', '𝓣': 't', '𝓓': 'd',
-    }
-
-    # Replace fancy Unicode characters with regular ones
-    for fancy_char, normal_char in fancy_char_map.items():
-        name = name.replace(fancy_char, normal_char)
-    
-    # Apply substitutions
-    for char, replacement in substitutions.items():
-        name = name.replace(char, replacement)
-    
+
+    # Collapse multi-character sequences, then map single characters
+    name = _MULTI_PATTERN.sub(lambda match: _MULTI_SUBS[match.group(0)], name)
+    name = name.translate(_CHAR_TABLE)
+
     # Normalize Unicode characters
     name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('utf-8')
-    
-    # Remove non-ASCII characters
-    name = re.sub(r'[^\x00-\x7F]+', '', name)
-    
+
     # Remove any remaining non-alphabetic characters
-    name = re.sub(r'[^a-z]', '', name)
-    
-    return name
+    return _NON_ALPHA_PATTERN.sub('', name)
+
+# The bot's own normalized name never changes; compute it once at import
+BOT_NAME_NORM = normalize_name("AthenaSecure")
 
 def n_gram_similarity(name1, name2, n=2):
-    vectorizer = CountVectorizer(analyzer='char', ngram_range=(n, n))
-    all_ngrams = vectorizer.fit_transform([name1, name2])
-    ngram_matrix = all_ngrams.toarray()
-    
+    # Character n-gram sets; no vectorizer machinery needed for two short strings
+    ngrams1 = {name1[i:i + n] for i in range(len(name1) - n + 1)}
+    ngrams2 = {name2[i:i + n] for i in range(len(name2) - n + 1)}
+
     # Calculate Jaccard similarity
-    intersection = ngram_matrix[0] & ngram_matrix[1]  # Common n-grams
-    union = ngram_matrix[0] | ngram_matrix[1]  # Total unique n-grams
-    return intersection.sum() / union.sum() if union.sum() != 0 else 0
+    union = ngrams1 | ngrams2
+    return len(ngrams1 & ngrams2) / len(union) if union else 0
 
 def contains_suspicious_content(message):
     # Convert message to lowercase for case-insensitive matching
     lower_message = message.lower()
     
-    # Check for URLs
-    urls = URL_PATTERN.findall(lower_message)
-    if urls:
-        for url in urls:
-            # Check if the URL contains suspicious TLDs
-            if any(url.endswith('.' + tld) for tld in SUSPICIOUS_TLDS):
-                return True
-            # Check if the URL contains suspicious keywords
-            if any(keyword in url for keyword in SUSPICIOUS_KEYWORDS):
-                return True
-    
+    # Check each URL for suspicious TLDs or keywords, one pass per pattern
+    for url in URL_PATTERN.findall(lower_message):
+        if SUSPICIOUS_TLD_PATTERN.search(url) or SUSPICIOUS_KEYWORD_SUBSTRING_PATTERN.search(url):
+            return True
+
     # Check for crypto addresses
-    if ETH_ADDRESS_PATTERN.search(message) or BTC_ADDRESS_PATTERN.search(message):
-        return True
-    
-    # Check for suspicious keywords
-    words = re.findall(r'\b\w+\b', lower_message)
-    if any(keyword in words for keyword in SUSPICIOUS_KEYWORDS):
+    if CRYPTO_ADDRESS_PATTERN.search(message):
         return True
-    
-    # Check for two-word phrases
-    two_word_phrases = [' '.join(words[i:i+2]) for i in range(len(words)-1)]
-    if any(keyword in two_word_phrases for keyword in SUSPICIOUS_KEYWORDS):
-        return True
-    
-    return False
+
+    # One pass over the message covers single keywords and multi-word
+    # phrases alike
+    return SUSPICIOUS_KEYWORD_PATTERN.search(lower_message) is not None
@@ -1,9 +1,19 @@
-from fastapi import FastAPI, HTTPException, Header, Request
-from fastapi.responses import JSONResponse
+import asyncio
+import hmac
+from fastapi import FastAPI, HTTPException, Request
 from redis import Redis
 from web3 import Web3
-import json
+# orjson serializes queue payloads several times faster and emits bytes,
+# which redis accepts directly for RPUSH; stdlib json (and the matching
+# response class) stays as fallback
+try:
+    import orjson as json
+    from fastapi.responses import ORJSONResponse as JSONResponse
+except ImportError:
+    import json
+    from fastapi.responses import JSONResponse
 from datetime import datetime
+from functools import lru_cache
 import logging
 import os
 from typing import Dict, Any, List
@@ -33,7 +43,7 @@ logger = logging.getLogger(__name__)
 
 logger.setLevel(logging.INFO if DEV_MODE else logging.ERROR)
 
-app = FastAPI()
+app = FastAPI(default_response_class=JSONResponse)
 
 # Initialize Redis
 redis_client = Redis(
@@ -42,6 +52,12 @@ redis_client = Redis(
     decode_responses=True
 )
 
+def pretty_json(obj: Any) -> str:
+    """Indented JSON for DEV-mode logging, under either serializer"""
+    if hasattr(json, 'OPT_INDENT_2'):
+        return json.dumps(obj, option=json.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
 def extract_addresses_from_logs(logs: List[Dict[str, Any]]) -> List[str]:
     """Extract all unique addresses from event logs"""
     try:
@@ -56,38 +72,41 @@ class WebhookService:
             logger.info("DEV MODE enabled")
 
     @staticmethod
-    async def verify_moralis_signature(request: Request, x_signature: str = Header(...)) -> bool:
-        """Verify Moralis webhook signature"""
+    async def verify_moralis_signature(body: bytes, provided_signature: str) -> bool:
+        """Verify Moralis webhook signature against the raw request body"""
         if DEV_MODE:
             logger.info("DEV MODE: Skipping signature verification")
             return True
 
         try:
-            provided_signature = request.headers.get("x-signature")
-
             if not provided_signature:
                 return False
-            
+
             if provided_signature.startswith('0x'):
                 provided_signature = provided_signature[2:]
 
+            # A keccak-256 hex digest is always 64 chars; a wrong length can
+            # never verify, so reject before paying for the hash
+            if len(provided_signature) != 64:
+                return False
+
             secret = MORALIS_SECRET_KEY
             if not secret:
                 logger.error("MORALIS_SECRET_KEY not set")
                 return False
 
-            body = await request.body()
             if body is None:
                 logging.error("Error: Request data is None.")
                 return False
 
-            data = body + secret.encode()
-            signature = Web3.keccak(text=data.decode()).hex()
-            
+            # Hash the raw bytes (decoding broke on non-UTF8 payloads) and
+            # run the CPU-bound keccak off the event loop
+            signature = (await asyncio.to_thread(Web3.keccak, body + secret.encode())).hex()
+
             if signature.startswith('0x'):
                 signature = signature[2:]
 
-            return provided_signature == signature
+            return hmac.compare_digest(provided_signature.lower(), signature.lower())
 
         except Exception as e:
             logger.error(f"Signature verification failed: {e}")
@@ -146,23 +165,26 @@ webhook_service = WebhookService()
 async def process_webhook(request: Request):
     """Handle incoming webhooks"""
     try:
+        # Read the body once; signature check and JSON parse share the buffer
+        body = await request.body()
+
         # Verify Moralis signature
-        if not await webhook_service.verify_moralis_signature(request):
+        if not await webhook_service.verify_moralis_signature(body, request.headers.get("x-signature")):
             return JSONResponse(
                 status_code=200,
                 content={"status": "success", "message": "Nice try"}
             )
 
         # Get JSON data
-        data = await request.json()
+        data = json.loads(body) if body else None
         if not data:
             raise HTTPException(status_code=400, detail="No data received")
 
         if DEV_MODE:
             logger.info("Received Headers:")
-            logger.info(json.dumps(dict(request.headers), indent=2))
+            logger.info(pretty_json(dict(request.headers)))
             logger.info("Received Webhook Data:")
-            logger.info(json.dumps(data, indent=2))
+            logger.info(pretty_json(data))
 
         # Check block confirmation
         if not webhook_service.is_confirmed(data):
@@ -186,18 +208,24 @@ async def process_webhook(request: Request):
         
         # Handle different event types
         if event_type == 'new_token':
-            # Extract addresses from logs
-            addresses = extract_addresses_from_logs(data.get('logs', []))
-            
-            if not addresses:
+            # Group logs by address in a single pass instead of re-scanning
+            # the full log list once per address
+            logs_by_address = {}
+            for log in data.get('logs', []):
+                address = log.get('address')
+                if address:
+                    logs_by_address.setdefault(address, []).append(log)
+
+            if not logs_by_address:
                 return JSONResponse(
                     status_code=200,
                     content={"status": "success", "message": "No addresses found"}
                 )
-            
-            # Queue individual events for each address
+
+            # Queue individual events for each address in one round-trip
             queued_events = []
-            for address in addresses:
+            pipe = redis_client.pipeline(transaction=False)
+            for address, address_logs in logs_by_address.items():
                 event_data = {
                     'event_id': f"{data.get('id', str(datetime.utcnow().timestamp()))}_{address}",
                     'event_type': event_type,
@@ -206,17 +234,18 @@ async def process_webhook(request: Request):
                     'received_at': datetime.utcnow().isoformat(),
                     'address': address,
                     'raw_data': {
-                        'logs': [log for log in data.get('logs', []) if log.get('address') == address],
+                        'logs': address_logs,
                         'block': data.get('block'),
                         'chainId': data.get('chainId')
                     },
                     'retry_count': 0
                 }
-                redis_client.rpush('webhook_queue', json.dumps(event_data))
+                pipe.rpush('webhook_queue', json.dumps(event_data))
                 queued_events.append(event_data['event_id'])
                 if DEV_MODE:
                     logger.info(f"Queued event: {event_data}")
-            
+            pipe.execute()
+
             return JSONResponse(
                 status_code=202,
                 content={
@@ -302,8 +331,9 @@ async def process_webhook(request: Request):
                     content={"status": "success", "message": "No addresses found"}
                 )
             
-            # Queue individual events for each address
+            # Queue individual events for each address in one round-trip
             queued_events = []
+            pipe = redis_client.pipeline(transaction=False)
             for address in addresses:
                 event_data = {
                     'event_id': f"{data.get('id', str(datetime.utcnow().timestamp()))}_{address}",
@@ -314,11 +344,12 @@ async def process_webhook(request: Request):
                     'token_address': address,
                     'retry_count': 0
                 }
-                redis_client.rpush('webhook_queue', json.dumps(event_data))
+                pipe.rpush('webhook_queue', json.dumps(event_data))
                 queued_events.append(event_data['event_id'])
                 if DEV_MODE:
                     logger.info(f"Queued event: {event_data}")
-            
+            pipe.execute()
+
             return JSONResponse(
                 status_code=202,
                 content={
@@ -356,23 +387,29 @@ async def health_check():
         raise HTTPException(status_code=503, detail="Service unhealthy")
 
 
+@lru_cache(maxsize=1024)
+def checksum_address(address: str) -> str:
+    """Checksummed form of an address; the same LP tokens recur constantly"""
+    return Web3.to_checksum_address(address)
+
 def decode_lock_lp_input(input_data: str) -> Dict[str, Any]:
     """
     Decode Unicrypt lock LP function input data.
     Function signature: lockLPToken(address lpToken, uint256 amount, uint256 unlock_time, ...)
     """
     try:
-        # Remove function signature (first 4 bytes / 10 characters including '0x')
-        clean_data = input_data[10:]
-        
-        # Each parameter is 32 bytes (64 characters)
-        lp_token = '0x' + clean_data[:64][-40:]  # Get last 20 bytes for address
-        raw_amount = int(clean_data[64:128], 16)
+        # Decode the hex once, then slice 32-byte words instead of parsing
+        # hex substrings with int(str, 16)
+        raw = bytes.fromhex(input_data[2:] if input_data.startswith('0x') else input_data)
+        words = raw[4:]  # Skip the 4-byte function selector
+
+        lp_token = '0x' + words[12:32].hex()  # Last 20 bytes of the first word
+        raw_amount = int.from_bytes(words[32:64], 'big')
         amount = raw_amount / (10 ** 18)  # Convert from wei to ether (18 decimals for LP tokens)
-        unlock_time = int(clean_data[128:192], 16)
-        
+        unlock_time = int.from_bytes(words[64:96], 'big')
+
         return {
-            'lp_token': Web3.to_checksum_address(lp_token),
+            'lp_token': checksum_address(lp_token),
             'amount': amount,
             'raw_amount': raw_amount,  # Keep the raw amount in case needed
             'unlock_time': unlock_time
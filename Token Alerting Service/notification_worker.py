@@ -1,5 +1,6 @@
 import redis
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
 import time
@@ -7,6 +8,8 @@ import threading
 import queue
 import logging
 import asyncio
+from collections import namedtuple
+from functools import lru_cache
 from supabase import create_client, acreate_client, Client, AClient
 
 import sys
@@ -32,7 +35,7 @@ DEV_MODE = os.getenv('DEV_MODE', 'false').lower() == 'true'
 
 # Initialize clients
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-redis_client = redis.StrictRedis(host=REDIS_HOST, port=REDIS_PORT, db=0)
+redis_client = redis.StrictRedis(host=REDIS_HOST, port=REDIS_PORT, db=0, decode_responses=True)
 
 # Environment variables with dev/prod bot tokens. Hard coded token was for in the moment testing with an ad-hoc bot :)
 TELEGRAM_BOT_TOKEN = '7201817971:AAHA6vRXEJptxNMe10XghPvxq0Qt2K599sY' if DEV_MODE else os.getenv('TELEGRAM_BOT_TOKEN')
@@ -40,18 +43,115 @@ TELEGRAM_BOT_TOKEN = '7201817971:AAHA6vRXEJptxNMe10XghPvxq0Qt2K599sY' if DEV_MOD
 # Queue to hold messages to be sent
 message_queue = queue.Queue()
 
-# Lock to synchronize rate limiting
-rate_limit_lock = threading.Lock()
+# One persistent keep-alive session per thread so consumers reuse TCP/TLS
+# connections to api.telegram.org instead of paying a handshake per message
+_thread_local = threading.local()
+
+def get_telegram_session():
+    session = getattr(_thread_local, 'telegram_session', None)
+    if session is None:
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=0))
+        _thread_local.telegram_session = session
+    return session
+
+# Token bucket kept in Redis and refilled/decremented atomically by a Lua
+# script, so every consumer thread (and every replica of this worker)
+# draws from the same quota. Returns 0 when a token was taken, otherwise
+# the number of milliseconds to sleep before retrying.
+TOKEN_BUCKET_LUA = """
+local tokens, last = unpack(redis.call('HMGET', KEYS[1], 'tokens', 'last'))
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+if tokens == false then
+    tokens = capacity
+    last = now
+else
+    tokens = tonumber(tokens)
+    last = tonumber(last)
+end
+tokens = math.min(capacity, tokens + (now - last) * rate / 1000)
+local wait_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait_ms = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HMSET', KEYS[1], 'tokens', tokens, 'last', now)
+redis.call('PEXPIRE', KEYS[1], 60000)
+return wait_ms
+"""
+
+class RedisTokenBucket:
+    """
+    Shared token bucket backed by Redis. The Lua script does the refill
+    and decrement in one atomic step; acquire() sleeps whatever the
+    script says is left before a token frees up, then retries.
+    """
+    def __init__(self, client, key, rate, capacity):
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+        self._script = client.register_script(TOKEN_BUCKET_LUA)
 
-# Rate limiting shared variables
-messages_sent = 0
-rate_limit_start_time = time.time()
+    def acquire(self):
+        while True:
+            now_ms = int(time.time() * 1000)
+            wait_ms = self._script(keys=[self.key], args=[self.rate, self.capacity, now_ms])
+            if wait_ms == 0:
+                return
+            time.sleep(wait_ms / 1000)
+
+# Telegram allows ~30 messages/sec per bot token, shared across workers
+TG_BUCKET = RedisTokenBucket(redis_client, 'tg:bucket', rate=30, capacity=30)
 
 chain_id_mapping = {
     "0x1": "Ethereum",
     "0xaa36a7": "Sepolia Testnet"
 }
 
+# Index sets so message fan-out reads candidate user ids directly instead
+# of scanning the whole keyspace per message. Users are bucketed by the
+# event type their alert_type filter constrains them to; 'any' holds users
+# whose filter imposes no event constraint.
+USER_INDEX_KEY = 'user_index'
+EVENT_INDEX_PREFIX = 'user_index:event:'
+EVENT_INDEX_BUCKETS = ('any', 'new_token', 'new_pair')
+
+# How many commands to stage per pipeline flush on bulk reads
+PIPELINE_BATCH_SIZE = 500
+
+def event_index_bucket(filters):
+    alert_type = (filters.get('alert_type') or '').lower()
+    if alert_type == 'new tge':
+        return 'new_token'
+    if alert_type == 'new dex listing':
+        return 'new_pair'
+    return 'any'
+
+def index_user(user_id, filters, pipe=None):
+    """Stage the index-set writes; pass a pipe to batch with other commands"""
+    bucket = event_index_bucket(filters)
+    own_pipe = pipe is None
+    if own_pipe:
+        pipe = redis_client.pipeline(transaction=False)
+    pipe.sadd(USER_INDEX_KEY, user_id)
+    for candidate in EVENT_INDEX_BUCKETS:
+        if candidate == bucket:
+            pipe.sadd(EVENT_INDEX_PREFIX + candidate, user_id)
+        else:
+            pipe.srem(EVENT_INDEX_PREFIX + candidate, user_id)
+    if own_pipe:
+        pipe.execute()
+
+def deindex_user(user_id):
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.srem(USER_INDEX_KEY, user_id)
+    for candidate in EVENT_INDEX_BUCKETS:
+        pipe.srem(EVENT_INDEX_PREFIX + candidate, user_id)
+    pipe.execute()
+
 def send_telegram_message(chat_id, message, max_retries=3, base_delay=1):
     """
     Send message to Telegram with retry logic and proper rate limit handling.
@@ -84,7 +184,7 @@ def send_telegram_message(chat_id, message, max_retries=3, base_delay=1):
                 logger.info(f"Making request to Telegram API (Attempt {attempt + 1}/{max_retries})")
                 logger.info(f"Payload: {payload}")
             
-            response = requests.post(url, json=payload)
+            response = get_telegram_session().post(url, json=payload, timeout=10)
             
             if response.status_code == 429:
                 retry_after = response.json().get('parameters', {}).get('retry_after', base_delay)
@@ -121,12 +221,13 @@ def message_producer():
     """
     while True:
         try:
-            message_data = redis_client.lpop('notification_queue')
-            if message_data:
+            # Block on the queue instead of polling lpop + sleep; the
+            # timeout keeps the loop responsive to shutdown/errors
+            result = redis_client.blpop('notification_queue', timeout=5)
+            if result:
+                _, message_data = result
                 message = json.loads(message_data)
                 message_queue.put(message)
-            else:
-                time.sleep(0.1)  # Small sleep to prevent tight loop when queue is empty
         except Exception as e:
             logging.error(f"Error fetching message from Redis: {str(e)}")
 
@@ -135,7 +236,6 @@ def message_consumer():
     Send messages from the queue to all subscribed Telegram chat IDs, 
     adhering to rate limits.
     """
-    global messages_sent, rate_limit_start_time
     last_redis_log = time.time()
     LOG_INTERVAL = 300  # Log Redis state every 5 minutes
 
@@ -154,34 +254,41 @@ def message_consumer():
             if DEV_MODE:
                 logger.info(f"Processing message: {json.dumps(message_data, indent=2)}")
 
-            # Iterate over all user keys
-            for user_key in redis_client.scan_iter('user:*'):
-                user_data = redis_client.hgetall(user_key)
-                if not user_data:
-                    continue
+            # Normalize message fields once, then fan out to indexed
+            # candidates for this event type instead of scanning every
+            # user key per message
+            normalized = normalize_message(message_data)
+            candidate_ids = redis_client.sunion(
+                EVENT_INDEX_PREFIX + 'any',
+                EVENT_INDEX_PREFIX + normalized.event_type
+            )
 
-                filters = json.loads(user_data.get(b'filters', '{}').decode('utf-8'))
-                tg_id = user_data.get(b'telegram_id')
-                
-                if not tg_id:
-                    continue
+            # Read candidate hashes in pipelined batches rather than one
+            # round-trip per user
+            user_keys = [f"user:{user_id}" for user_id in candidate_ids]
+            for batch_start in range(0, len(user_keys), PIPELINE_BATCH_SIZE):
+                batch = user_keys[batch_start:batch_start + PIPELINE_BATCH_SIZE]
+                pipe = redis_client.pipeline(transaction=False)
+                for user_key in batch:
+                    pipe.hmget(user_key, 'filters', 'telegram_id')
+                batch_results = pipe.execute()
 
-                if apply_filters(filters, message_data): 
-                    with rate_limit_lock:
-                        if messages_sent >= 30:
-                            elapsed_time = time.time() - rate_limit_start_time
-                            if elapsed_time < 1:
-                                time.sleep(1 - elapsed_time)
-                            messages_sent = 0
-                            rate_limit_start_time = time.time()
+                for user_key, (filters_raw, tg_id) in zip(batch, batch_results):
+                    if not tg_id:
+                        continue
 
-                    display_preference = filters.get('display_preference', 'standard')
-                    display_message = format_message(display_preference, message_data)
+                    filters_json = filters_raw if filters_raw else '{}'
 
-                    logging.info(f"Sending message to {tg_id.decode('utf-8')}: {display_message}")
+                    matches_filters, display_preference = compile_filters(filters_json)
 
-                    send_telegram_message(tg_id.decode('utf-8'), display_message)
-                    messages_sent += 1
+                    if matches_filters(normalized):
+                        TG_BUCKET.acquire()
+
+                        display_message = format_message(display_preference, message_data)
+
+                        logging.info(f"Sending message to {tg_id}: {display_message}")
+
+                        send_telegram_message(tg_id, display_message)
 
             message_queue.task_done()
 
@@ -207,6 +314,9 @@ def initialize_user_cache():
 
             logging.info(f"Processing batch of {len(query.data)} users starting at index {start}")
 
+            # Stage every user's writes for this page in one pipeline flush
+            pipe = redis_client.pipeline(transaction=False)
+
             for user in query.data:
                 user_id = user.get('id')
                 logging.info(f"Processing user: {json.dumps(user, indent=2)}")
@@ -263,12 +373,15 @@ def initialize_user_cache():
                 }
 
                 # Store both the user data and the telegram mapping
-                redis_client.hmset(redis_key, user_data)
-                redis_client.set(f"telegram_map:{tg_id}", user_id)
-                
+                pipe.hset(redis_key, mapping=user_data)
+                pipe.set(f"telegram_map:{tg_id}", user_id)
+                index_user(user_id, filters, pipe=pipe)
+
                 total_users += 1
                 logging.info(f"Stored user {user_id} with telegram ID {tg_id}")
 
+            pipe.execute()
+
             if len(query.data) < page_size:
                 break
 
@@ -282,117 +395,197 @@ def initialize_user_cache():
         logging.error(f"Traceback:", exc_info=True)
         raise
 
+def remove_cached_user(user_id):
+    """Drop a user's hash, telegram mapping and index entries from Redis"""
+    redis_key = f"user:{user_id}"
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hget(redis_key, 'telegram_id')
+    pipe.unlink(redis_key)
+    tg_id, _ = pipe.execute()
+    if tg_id:
+        redis_client.unlink(f"telegram_map:{tg_id}")
+    deindex_user(user_id)
+
 def check_socials_exist(token_data):
     """
     Check if any of the socials exist, return False is none.
     """
     return any(token_data.get(key) for key in ['twitter', 'telegram', 'discord', 'website'])
 
-def apply_filters(filters, message_data):
+risk_level_mapping = {
+    'Safe': 0,
+    'Low': 1,
+    'Medium': 2,
+    'High': 3
+}
+
+# Message fields pre-normalized once per message so the per-user predicates
+# only compare plain values
+NormalizedMessage = namedtuple('NormalizedMessage', [
+    'event_type',
+    'classification',
+    'risk_value',
+    'contract_verified',
+    'blockchain',
+    'has_social',
+    'locked_lp',
+    'buy_tax',
+    'buy_tax_invalid',
+    'sell_tax',
+    'sell_tax_invalid',
+])
+
+def parse_tax(raw, label):
+    """
+    Parse a tax value like '5%' to a float once per message. Returns
+    (value, invalid): value is None when the field is absent/empty,
+    invalid is True when a present value failed to parse.
+    """
+    if not raw:
+        return None, False
+    try:
+        return float(str(raw).replace('%', '').strip()), False
+    except Exception as e:
+        logging.error(f"Error parsing {label} tax filter: {str(e)}")
+        return None, True
+
+def normalize_message(message_data):
+    """
+    Lowercase, map and float-parse the message fields exactly once per
+    message, before the user fan-out loop.
     """
-    Apply user filters to the message data.
+    blockchain = chain_id_mapping.get(message_data.get('chain_id'))
+    buy_tax, buy_tax_invalid = parse_tax(message_data.get('buy_tax', ''), 'buy')
+    sell_tax, sell_tax_invalid = parse_tax(message_data.get('sell_tax', ''), 'sell')
+    return NormalizedMessage(
+        event_type=(message_data.get('event_type') or '').lower(),
+        classification=message_data.get('classification', '').lower(),
+        risk_value=risk_level_mapping.get(message_data.get('risk_level', '').lower().capitalize(), -1),
+        contract_verified=message_data.get('contract_verified', False),
+        blockchain=blockchain.lower() if blockchain else None,
+        has_social=check_socials_exist(message_data),
+        locked_lp=message_data.get('locked_lp', 0.0),
+        buy_tax=buy_tax,
+        buy_tax_invalid=buy_tax_invalid,
+        sell_tax=sell_tax,
+        sell_tax_invalid=sell_tax_invalid,
+    )
+
+@lru_cache(maxsize=4096)
+def compile_filters(filters_json):
     """
-    risk_level_mapping = {
-        'Safe': 0,
-        'Low': 1,
-        'Medium': 2,
-        'High': 3
-    }
+    Compile a user's filter dict (passed as its raw JSON string) into a
+    predicate over message data. All filter-side parsing — lowercasing,
+    float casts, the blockchain set — happens once here instead of per
+    message; keying the cache on the JSON string means an updated filter
+    row compiles to a fresh predicate automatically.
+
+    Returns (predicate, display_preference).
+    """
+    filters = json.loads(filters_json)
 
     # Extract filters - Updated to match actual data types
-    filter_buy_tax = filters.get('buy_tax')  # Now an integer
-    filter_sell_tax = filters.get('sell_tax')  # Now an integer
     filter_risk_level = filters.get('risk_level', '').lower()  # String, lowercase for comparison
     filter_contract_verified = filters.get('contract_verified')  # Now a boolean
-    filter_classification = filters.get('classification', '').lower()   
+    filter_classification = filters.get('classification', '').lower()
     filter_event_type = filters.get('alert_type', '').lower()
     filter_has_social = filters.get('has_social')  # Now a boolean
-    filter_blockchain = filters.get('blockchains', [])  # Now an array
     filter_locked_lp = filters.get('locked_lp')  # integer
+    display_preference = filters.get('display_preference', 'standard')
+
+    blockchain_set = {b.lower() for b in filters.get('blockchains', [])}
+    filter_risk_value = risk_level_mapping.get(filter_risk_level.capitalize(), -1)
 
-    # Extract message data
-    message_buy_tax = message_data.get('buy_tax', '')
-    message_sell_tax = message_data.get('sell_tax', '')
-    message_risk_level = message_data.get('risk_level', '').lower()
-    message_contract_verified = message_data.get('contract_verified', False)
-    message_classification = message_data.get('classification', '').lower()
-    message_event_type = message_data.get('event_type', '').lower()
-    message_socials = check_socials_exist(message_data)
-    message_blockchain = chain_id_mapping.get(message_data.get('chain_id'))
-    message_locked_lp = message_data.get('locked_lp', 0.0)
-
-    # Check blockchain
-    if filter_blockchain and message_blockchain and message_blockchain.lower() not in [b.lower() for b in filter_blockchain]:
-        return False
-
-    # Check socials - Updated for boolean comparison
-    if filter_has_social is True and not message_socials:
-        return False
-
-    # Check event type - Updated for 'all' case
-    # TODO - make it multi selection
-    if filter_event_type != 'all':
-        if filter_event_type == 'new tge' and message_event_type != 'new_token':
+    # Numeric filters are cast once; a malformed value makes the predicate
+    # reject everything, as the old per-message parse did
+    min_locked_percentage = None
+    locked_lp_invalid = False
+    if filter_locked_lp:
+        try:
+            min_locked_percentage = float(filter_locked_lp)
+        except Exception as e:
+            logging.error(f"Error parsing LP lock filter: {str(e)}")
+            locked_lp_invalid = True
+
+    filter_buy_tax_value = None
+    buy_tax_invalid = False
+    if filters.get('buy_tax'):
+        try:
+            filter_buy_tax_value = float(filters['buy_tax'])
+        except Exception as e:
+            logging.error(f"Error parsing buy tax filter: {str(e)}")
+            buy_tax_invalid = True
+
+    filter_sell_tax_value = None
+    sell_tax_invalid = False
+    if filters.get('sell_tax'):
+        try:
+            filter_sell_tax_value = float(filters['sell_tax'])
+        except Exception as e:
+            logging.error(f"Error parsing sell tax filter: {str(e)}")
+            sell_tax_invalid = True
+
+    def predicate(msg):
+        # Check blockchain
+        if blockchain_set and msg.blockchain and msg.blockchain not in blockchain_set:
             return False
-        elif filter_event_type == 'new dex listing' and message_event_type != 'new_pair':
+
+        # Check socials - Updated for boolean comparison
+        if filter_has_social is True and not msg.has_social:
             return False
 
-    # Check locked LP if dex alert, filter is set and event type is not new token
-    if message_event_type != 'new_token':
-        if filter_locked_lp and filter_event_type != 'new tge':
-            try:
-                min_locked_percentage = float(filter_locked_lp)
-                if message_locked_lp < min_locked_percentage:
-                    return False
-            except Exception as e:
-                logging.error(f"Error parsing LP lock filter: {str(e)}")
+        # Check event type - Updated for 'all' case
+        # TODO - make it multi selection
+        if filter_event_type != 'all':
+            if filter_event_type == 'new tge' and msg.event_type != 'new_token':
+                return False
+            elif filter_event_type == 'new dex listing' and msg.event_type != 'new_pair':
                 return False
 
-    # Check classification - Updated for 'all' case
-    if filter_classification != 'all':
-        if filter_classification == 'exclude memecoins':
-            if message_classification == 'memecoins':
+        # Check locked LP if dex alert, filter is set and event type is not new token
+        if msg.event_type != 'new_token':
+            if filter_locked_lp and filter_event_type != 'new tge':
+                if locked_lp_invalid or msg.locked_lp < min_locked_percentage:
+                    return False
+
+        # Check classification - Updated for 'all' case
+        if filter_classification != 'all':
+            if filter_classification == 'exclude memecoins':
+                if msg.classification == 'memecoins':
+                    return False
+            elif filter_classification != msg.classification:
                 return False
-        elif filter_classification != message_classification:
-            return False
 
-    # Check contract verified - Now using boolean comparison
-    if filter_contract_verified is True and not message_contract_verified:
-        return False
+        # Check contract verified - Now using boolean comparison
+        if filter_contract_verified is True and not msg.contract_verified:
+            return False
 
-    # Check risk level - Updated for case-insensitive comparison
-    if filter_risk_level:
-        message_risk_value = risk_level_mapping.get(message_risk_level.capitalize(), -1)
-        filter_risk_value = risk_level_mapping.get(filter_risk_level.capitalize(), -1)
-        if message_risk_value > filter_risk_value:
+        # Check risk level - Updated for case-insensitive comparison
+        if filter_risk_level and msg.risk_value > filter_risk_value:
             return False
-        
-    # Check buy tax
-    if filter_buy_tax:  # Check if filter is set (not empty string)
-        try:
-            filter_buy_tax_value = float(filter_buy_tax)  # Convert integer to float
-            if message_buy_tax:
-                message_buy_tax_value = float(str(message_buy_tax).replace('%', '').strip())
-                if message_buy_tax_value > filter_buy_tax_value:
-                    return False
-        except Exception as e:
-            logging.error(f"Error parsing buy tax filter: {str(e)}")
+
+        # Check buy tax
+        if buy_tax_invalid:
             return False
-        
-    # Check sell tax
-    if filter_sell_tax:  # Check if filter is set (not empty string)
-        try:
-            filter_sell_tax_value = float(filter_sell_tax)  # Convert integer to float
-            if message_sell_tax:
-                message_sell_tax_value = float(str(message_sell_tax).replace('%', '').strip())
-                if message_sell_tax_value > filter_sell_tax_value:
-                    return False
-        except Exception as e:
-            logging.error(f"Error parsing sell tax filter: {str(e)}")
+        if filter_buy_tax_value is not None:
+            if msg.buy_tax_invalid:
+                return False
+            if msg.buy_tax is not None and msg.buy_tax > filter_buy_tax_value:
+                return False
+
+        # Check sell tax
+        if sell_tax_invalid:
             return False
+        if filter_sell_tax_value is not None:
+            if msg.sell_tax_invalid:
+                return False
+            if msg.sell_tax is not None and msg.sell_tax > filter_sell_tax_value:
+                return False
 
-    # If all checks pass
-    return True
+        # If all checks pass
+        return True
+
+    return predicate, display_preference
 
 def log_redis_state():
     """
@@ -401,25 +594,30 @@ def log_redis_state():
     try:
         logging.info("Current Redis Cache State:")
         
-        # Log all user keys
-        user_keys = redis_client.keys("user:*")
-        telegram_maps = redis_client.keys("telegram_map:*")
+        # Log all user keys; SCAN with a large count hint instead of the
+        # blocking O(N) KEYS
+        user_keys = list(redis_client.scan_iter(match="user:*", count=2000))
+        telegram_maps = list(redis_client.scan_iter(match="telegram_map:*", count=2000))
         
         logging.info(f"Found {len(user_keys)} users and {len(telegram_maps)} telegram mappings in Redis")
         
-        for key in user_keys:
-            try:
-                # Decode the key from bytes
-                decoded_key = key.decode('utf-8')
-                user_data = redis_client.hgetall(key)
-                if user_data:
-                    tg_id = user_data.get(b'telegram_id', b'None').decode('utf-8')
-                    filters = json.loads(user_data.get(b'filters', b'{}').decode('utf-8'))
-                    logging.info(f"User {decoded_key}:")
-                    logging.info(f"  Telegram ID: {tg_id}")
-                    logging.info(f"  Filters: {json.dumps(filters, indent=2)}")
-            except Exception as e:
-                logging.error(f"Error decoding data for key {key}: {str(e)}")
+        for batch_start in range(0, len(user_keys), PIPELINE_BATCH_SIZE):
+            batch = user_keys[batch_start:batch_start + PIPELINE_BATCH_SIZE]
+            pipe = redis_client.pipeline(transaction=False)
+            for key in batch:
+                pipe.hmget(key, 'telegram_id', 'filters')
+            batch_results = pipe.execute()
+
+            for key, (tg_raw, filters_raw) in zip(batch, batch_results):
+                try:
+                    if tg_raw is not None or filters_raw is not None:
+                        tg_id = tg_raw or 'None'
+                        filters = json.loads(filters_raw or '{}')
+                        logging.info(f"User {key}:")
+                        logging.info(f"  Telegram ID: {tg_id}")
+                        logging.info(f"  Filters: {json.dumps(filters, indent=2)}")
+                except Exception as e:
+                    logging.error(f"Error decoding data for key {key}: {str(e)}")
 
     except Exception as e:
         logging.error(f"Error inspecting Redis cache: {str(e)}")
@@ -471,12 +669,7 @@ async def setup_realtime_listeners():
 
                 if not query.data:
                     # User was deleted, clean up Redis
-                    current_data = redis_client.hgetall(redis_key)
-                    if current_data:
-                        tg_id = current_data.get(b'telegram_id')
-                        if tg_id:
-                            redis_client.delete(f"telegram_map:{tg_id.decode('utf-8')}")
-                    redis_client.delete(redis_key)
+                    remove_cached_user(user_id)
                     logging.info(f"Removed user {user_id} from Redis - User deleted")
                     return
 
@@ -484,12 +677,7 @@ async def setup_realtime_listeners():
 
                 # Check subscription status
                 if not user.get('user_subscriptions'):
-                    current_data = redis_client.hgetall(redis_key)
-                    if current_data:
-                        tg_id = current_data.get(b'telegram_id')
-                        if tg_id:
-                            redis_client.delete(f"telegram_map:{tg_id.decode('utf-8')}")
-                    redis_client.delete(redis_key)
+                    remove_cached_user(user_id)
                     logging.info(f"Removed user {user_id} from Redis - No active subscription")
                     return
 
@@ -497,12 +685,7 @@ async def setup_realtime_listeners():
                 user_info = user.get('user_information')
                 if not user_info:
                     logging.info(f"No user_information for user {user_id}")
-                    current_data = redis_client.hgetall(redis_key)
-                    if current_data:
-                        tg_id = current_data.get(b'telegram_id')
-                        if tg_id:
-                            redis_client.delete(f"telegram_map:{tg_id.decode('utf-8')}")
-                    redis_client.delete(redis_key)
+                    remove_cached_user(user_id)
                     log_redis_state()
                     return
 
@@ -510,12 +693,7 @@ async def setup_realtime_listeners():
                 linked_accounts = user_info.get('linked_accounts', [])
                 if linked_accounts is None:
                     logging.info(f"Linked accounts is None for user {user_id}")
-                    current_data = redis_client.hgetall(redis_key)
-                    if current_data:
-                        tg_id = current_data.get(b'telegram_id')
-                        if tg_id:
-                            redis_client.delete(f"telegram_map:{tg_id.decode('utf-8')}")
-                    redis_client.delete(redis_key)
+                    remove_cached_user(user_id)
                     log_redis_state()
                     return
 
@@ -531,12 +709,7 @@ async def setup_realtime_listeners():
                 # If no telegram account found, remove from Redis
                 if not telegram_account:
                     logging.info(f"No telegram account found for user {user_id}")
-                    current_data = redis_client.hgetall(redis_key)
-                    if current_data:
-                        tg_id = current_data.get(b'telegram_id')
-                        if tg_id:
-                            redis_client.delete(f"telegram_map:{tg_id.decode('utf-8')}")
-                    redis_client.delete(redis_key)
+                    remove_cached_user(user_id)
                     log_redis_state()
                     return
 
@@ -559,10 +732,13 @@ async def setup_realtime_listeners():
                     "telegram_id": tg_id
                 }
 
-                # Store/update the mappings
-                redis_client.hmset(redis_key, user_data)
-                redis_client.set(f"telegram_map:{tg_id}", user_id)
-                
+                # Store/update the mappings in one round-trip
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.hset(redis_key, mapping=user_data)
+                pipe.set(f"telegram_map:{tg_id}", user_id)
+                index_user(user_id, filters, pipe=pipe)
+                pipe.execute()
+
                 logging.info(f"Updated user {user_id} with telegram ID {tg_id}")
                 log_redis_state()
 
@@ -621,17 +797,21 @@ async def run_realtime_listeners():
 
 def clear_service_redis_cache():
     try:
-        user_keys = redis_client.keys("user:*")
-        telegram_maps = redis_client.keys("telegram_map:*")
-        
-        if user_keys:
-            redis_client.delete(*user_keys)
-        if telegram_maps:
-            redis_client.delete(*telegram_maps)
-        
+        user_keys = list(redis_client.scan_iter(match="user:*", count=2000))
+        telegram_maps = list(redis_client.scan_iter(match="telegram_map:*", count=2000))
+
+        # UNLINK frees the values off the main thread; chunked so no single
+        # command carries an unbounded argument list
+        doomed = user_keys + telegram_maps
+        pipe = redis_client.pipeline(transaction=False)
+        for batch_start in range(0, len(doomed), PIPELINE_BATCH_SIZE):
+            pipe.unlink(*doomed[batch_start:batch_start + PIPELINE_BATCH_SIZE])
+        pipe.unlink(USER_INDEX_KEY, *(EVENT_INDEX_PREFIX + bucket for bucket in EVENT_INDEX_BUCKETS))
+        pipe.execute()
+
         logging.info(f"Cleared {len(user_keys)} user keys and {len(telegram_maps)} telegram mappings from Redis cache")
         
-        remaining_keys = redis_client.keys("user:*") + redis_client.keys("telegram_map:*")
+        remaining_keys = list(redis_client.scan_iter(match="user:*", count=2000)) + list(redis_client.scan_iter(match="telegram_map:*", count=2000))
         if not remaining_keys:
             logging.info("Redis cache successfully cleared for this service")
         else:
@@ -666,6 +846,11 @@ if __name__ == '__main__':
 
         # Run the async listener in the event loop
         logging.info("Starting realtime listeners...")
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
         asyncio.run(run_realtime_listeners())
 
         # These joins will only be reached if the async code exits
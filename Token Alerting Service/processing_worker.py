@@ -1087,4 +1087,11 @@ def is_token_renounced(address: str, chain_id: str) -> bool:
         return False
 
 if __name__ == "__main__":
+    # uvloop's C event loop cuts per-task/callback overhead; fall back to
+    # the stock loop where it isn't installed
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(start_worker())
\ No newline at end of file